@@ -1,28 +1,31 @@
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Depends, Request, Security
+from fastapi import FastAPI, HTTPException, Depends, Header, Response, Security
+from fastapi.responses import FileResponse
 from fastapi.security.api_key import APIKeyHeader
 from fastapi.openapi.models import APIKey
 from fastapi.openapi.utils import get_openapi
-from slowapi import Limiter
-from slowapi.util import get_remote_address
-from slowapi.middleware import SlowAPIMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from redis.asyncio import Redis
 from bson import ObjectId
 from utils.settings import settings
 from utils.auth import check_api_key
-from models.params import QueryParams
+from utils.rate_limiter import LocalRateLimiter
+from utils.cover_images import get_cover_path
+from models.params import QueryParams, ChangeSummaryParams, DailySummaryParams
 from models.constants import Change_Status
+from utils.change_summary import SUMMARY_COLLECTION, DAILY_SUMMARY_COLLECTION
 
 
-limiter = Limiter(
-    key_func=get_remote_address,
-    storage_uri=settings.REDIS_URI
-)
 rate_limit = f"{settings.LIMITER_FREQUENCY}/{settings.LIMITER_TIMING}"
+limiter = LocalRateLimiter(
+    Redis.from_url(settings.REDIS_URI),
+    rate_limit,
+    lease_size=settings.LIMITER_LEASE_SIZE
+)
 
 app = FastAPI()
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
+# The API key is checked before the rate limiter so unauthorized requests don't use up the quota
+route_dependencies = [Security(check_api_key), Depends(limiter)]
 
 API_KEY_NAME = settings.API_KEY_NAME
 api_key_header = APIKeyHeader(name=API_KEY_NAME, auto_error=False)
@@ -31,12 +34,14 @@ mongo_client = AsyncIOMotorClient(settings.MONGO_URI)
 db = mongo_client[settings.MONGO_DB]
 
 
-@app.get("/books")
-@limiter.limit(rate_limit)
+def set_cover_url(book: dict):
+    cover = book.pop("cover", None)
+    book["cover_url"] = app.url_path_for("get_book_cover", book_id=book["_id"]) if cover else None
+
+
+@app.get("/books", dependencies=route_dependencies)
 async def get_books(
-    request: Request,
-    params: QueryParams = Depends(),
-    authorized: bool = Security(check_api_key)):
+    params: QueryParams = Depends()):
     
     final_query = {}
     if params.category:
@@ -80,6 +85,7 @@ async def get_books(
     
     for book in books:
         book["_id"] = str(book["_id"])
+        set_cover_url(book)
     
     total_count = await db.books.count_documents(final_query)
     
@@ -87,12 +93,9 @@ async def get_books(
 
 
 
-@app.get("/books/{book_id}")
-@limiter.limit(rate_limit)
+@app.get("/books/{book_id}", dependencies=route_dependencies)
 async def get_single_book(
-    request: Request,
-    book_id: str,
-    authorized: bool = Security(check_api_key)):
+    book_id: str):
     
     if not ObjectId.is_valid(book_id):
         raise HTTPException(status_code=400, detail="invalid id")
@@ -105,17 +108,45 @@ async def get_single_book(
         raise HTTPException(status_code=404, detail="not found")
 
     book["_id"] = str(book["_id"])
+    set_cover_url(book)
     
     return book
 
 
-@app.get("/changes")
-@limiter.limit(rate_limit)
+@app.get("/books/{book_id}/cover", dependencies=route_dependencies)
+async def get_book_cover(
+    book_id: str,
+    if_none_match: Optional[str] = Header(None)):
+    
+    if not ObjectId.is_valid(book_id):
+        raise HTTPException(status_code=400, detail="invalid id")
+    
+    book = await db.books.find_one({"_id": ObjectId(book_id)}, projection={"cover": 1})
+    
+    if not book or not book.get("cover"):
+        raise HTTPException(status_code=404, detail="not found")
+    
+    cover = book["cover"]
+    cover_file = get_cover_path(cover["sha256"])
+    if not cover_file.exists():
+        raise HTTPException(status_code=404, detail="not found")
+    
+    headers = {
+        "ETag": f'"{cover["sha256"]}"',
+        "Cache-Control": f"private, max-age={settings.COVER_CACHE_MAX_AGE}",
+        "X-Content-Type-Options": "nosniff",
+    }
+    
+    if if_none_match and headers["ETag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    return FileResponse(cover_file, media_type=cover["content_type"], headers=headers)
+
+
+@app.get("/changes", dependencies=route_dependencies)
 async def get_changes(
-    request: Request,
     page:int=1,
-    page_size:int=20,
-    authorized: bool = Security(check_api_key)):
+    page_size:int=20):
     
     skip = (page - 1) * page_size
     
@@ -131,6 +162,56 @@ async def get_changes(
     
     return {"total_count": total_count, "page": page, "changes": changes}
 
+
+def build_summary_query(params: DailySummaryParams) -> dict:
+    final_query = {}
+    if params.start_date or params.end_date:
+        final_query["date"] = {}
+        if params.start_date:
+            final_query["date"]["$gte"] = params.start_date.isoformat()
+        if params.end_date:
+            final_query["date"]["$lte"] = params.end_date.isoformat()
+    if params.type is not None:
+        final_query["type"] = params.type
+    return final_query
+
+
+@app.get("/changes/summary", dependencies=route_dependencies)
+async def get_changes_summary(
+    params: ChangeSummaryParams = Depends()):
+    
+    final_query = build_summary_query(params)
+    if params.category:
+        final_query["category"] = {"$regex": params.category, "$options": "i"}
+    
+    skip = (params.page - 1) * params.page_size
+    
+    cursor = db[SUMMARY_COLLECTION].find(final_query, projection={"_id": 0}).sort([("date", -1), ("category", 1), ("type", 1)]).skip(skip).limit(params.page_size)
+    
+    summary = await cursor.to_list(length=params.page_size)
+    
+    total_count = await db[SUMMARY_COLLECTION].count_documents(final_query)
+    
+    return {"total_count": total_count, "page": params.page, "summary": summary}
+
+
+@app.get("/changes/summary/daily", dependencies=route_dependencies)
+async def get_changes_daily_summary(
+    params: DailySummaryParams = Depends()):
+    
+    final_query = build_summary_query(params)
+    
+    skip = (params.page - 1) * params.page_size
+    
+    cursor = db[DAILY_SUMMARY_COLLECTION].find(final_query, projection={"_id": 0}).sort([("date", -1), ("type", 1)]).skip(skip).limit(params.page_size)
+    
+    summary = await cursor.to_list(length=params.page_size)
+    
+    total_count = await db[DAILY_SUMMARY_COLLECTION].count_documents(final_query)
+    
+    return {"total_count": total_count, "page": params.page, "summary": summary}
+
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
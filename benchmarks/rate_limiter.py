@@ -0,0 +1,51 @@
+import time, asyncio, argparse, statistics
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter
+from redis.asyncio import Redis
+from utils.rate_limiter import LocalRateLimiter
+from utils.settings import settings
+
+
+def report(name: str, latencies: list, elapsed: float):
+    latencies = sorted(latencies)
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"{name:<24} {len(latencies)/elapsed:>10.0f} req/s   p50 {p50:>8.1f} us   p99 {p99:>8.1f} us   mean {statistics.mean(latencies)*1e6:>8.1f} us")
+
+
+def bench_redis_limiter(requests: int, clients: int, limit: str):
+    # The same storage and strategy slowapi's Limiter uses on every request.
+    storage = storage_from_string(settings.REDIS_URI)
+    strategy = FixedWindowRateLimiter(storage)
+    item = parse(limit)
+    latencies = []
+    started = time.perf_counter()
+    for i in range(requests):
+        t = time.perf_counter()
+        strategy.hit(item, "bench_redis", f"client-{i % clients}")
+        latencies.append(time.perf_counter() - t)
+    report("redis per request", latencies, time.perf_counter() - started)
+
+
+async def bench_local_limiter(requests: int, clients: int, limit: str, lease_size: int):
+    limiter = LocalRateLimiter(Redis.from_url(settings.REDIS_URI), limit, lease_size=lease_size, prefix="bench_local")
+    latencies = []
+    started = time.perf_counter()
+    for i in range(requests):
+        t = time.perf_counter()
+        await limiter.hit(f"client-{i % clients}")
+        latencies.append(time.perf_counter() - t)
+    report(f"local, lease {lease_size}", latencies, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-request Redis rate limiting with the local token bucket tier")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--limit", default="1000000/hour")
+    args = parser.parse_args()
+    
+    bench_redis_limiter(args.requests, args.clients, args.limit)
+    for lease_size in (10, 100):
+        asyncio.run(bench_local_limiter(args.requests, args.clients, args.limit, lease_size))
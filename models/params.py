@@ -1,4 +1,5 @@
 from typing import Optional
+from datetime import date
 from pydantic import BaseModel, Field
 
 class QueryParams(BaseModel):
@@ -15,3 +16,14 @@ class QueryParams(BaseModel):
     page: int = 1
     page_size: int = 20
 
+
+class DailySummaryParams(BaseModel):
+    start_date: Optional[date] = Field(None, description="First day to include")
+    end_date: Optional[date] = Field(None, description="Last day to include")
+    type: Optional[int] = Field(None, description="Change type, 1 for new books and 2 for changed books")
+    page: int = 1
+    page_size: int = 20
+
+
+class ChangeSummaryParams(DailySummaryParams):
+    category: Optional[str] = None
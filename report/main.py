@@ -0,0 +1,32 @@
+import asyncio, argparse
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorClient
+from utils.change_report import generate_change_report
+from utils.settings import settings
+
+
+def parse_date(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+async def run_report(start: datetime, end: datetime, compress: bool):
+    mongo_client = AsyncIOMotorClient(settings.MONGO_URI)
+    db = mongo_client[settings.MONGO_DB]
+    report = await generate_change_report(db, start, end, compress=compress)
+    print(f"{report['rows']} changes written to {report['file']}")
+
+
+if __name__ == "__main__":
+    today = datetime.today().replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    parser = argparse.ArgumentParser(description="Export the change report for a date range")
+    parser.add_argument("--start", type=parse_date, default=today, help="First day to include (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--end", type=parse_date, default=None, help="Last day to include (YYYY-MM-DD), defaults to start date")
+    parser.add_argument("--gzip", action=argparse.BooleanOptionalAction, default=settings.COMPRESS_CHANGE_REPORT, help="Compress the report with gzip, defaults to COMPRESS_CHANGE_REPORT")
+    args = parser.parse_args()
+    
+    end = (args.end or args.start) + timedelta(days=1)
+    if end <= args.start:
+        parser.error("--end must not be before --start")
+    
+    asyncio.run(run_report(args.start, end, args.gzip))
@@ -96,6 +96,29 @@ async def test_get_book_by_id(client, valid_headers):
         assert book_data["_id"] == book_id
 
 
+@pytest.mark.asyncio
+async def test_get_book_cover(client, valid_headers):
+    list_resp = await client.get("/books", headers=valid_headers)
+    assert list_resp.status_code == 200
+
+    books = list_resp.json().get("books", [])
+    if not books:
+        pytest.skip("No books found to test /books/{book_id}/cover")
+
+    book_id = str(books[0].get("_id"))
+    resp = await client.get(f"/books/{book_id}/cover", headers=valid_headers)
+    assert resp.status_code in (200, 404)
+
+    if resp.status_code == 200:
+        assert resp.headers["content-type"].startswith("image/")
+        assert "max-age" in resp.headers["cache-control"]
+        etag = resp.headers["etag"]
+
+        cached_resp = await client.get(f"/books/{book_id}/cover", headers={**valid_headers, "If-None-Match": etag})
+        assert cached_resp.status_code == 304
+        assert cached_resp.headers["etag"] == etag
+
+
 @pytest.mark.asyncio
 async def test_get_changes(client, valid_headers):
     resp = await client.get("/changes", headers=valid_headers)
@@ -107,6 +130,29 @@ async def test_get_changes(client, valid_headers):
         assert "book_id" in data[0]
 
 
+@pytest.mark.asyncio
+async def test_get_changes_summary(client, valid_headers):
+    resp = await client.get("/changes/summary", headers=valid_headers, params={"type": 2})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert "summary" in data
+    assert "total_count" in data
+    for row in data["summary"]:
+        assert row["type"] == 2
+        assert "category" in row
+        assert "count" in row
+
+
+@pytest.mark.asyncio
+async def test_get_changes_daily_summary(client, valid_headers):
+    resp = await client.get("/changes/summary/daily", headers=valid_headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert "total_count" in data
+    dates = [row["date"] for row in data["summary"]]
+    assert dates == sorted(dates, reverse=True)
+
+
 @pytest.mark.asyncio
 async def test_rate_limiting(client, valid_headers):
     for _ in range(100):
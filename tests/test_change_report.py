@@ -0,0 +1,107 @@
+import gzip, json, hashlib, pytest
+from datetime import datetime
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from utils.change_report import generate_change_report, update_manifest
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield dict(doc)
+        return iterate()
+
+
+class FakeDB:
+    def __init__(self, docs):
+        self.changes = self
+        self.docs = docs
+        self.queries = []
+
+    def find(self, query, **kwargs):
+        self.queries.append(query)
+        return FakeCursor(self.docs)
+
+
+def make_changes(count):
+    return [
+        {"_id": i, "type": 2, "book_id": f"book-{i}", "updated_at": datetime(2025, 10, 1, 12, 0), "changes": {"current_stock": i}}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def report_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "change_reports"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compress", [False, True])
+async def test_change_report_writes_ndjson(report_dir, compress):
+    db = FakeDB(make_changes(3))
+    report = await generate_change_report(db, datetime(2025, 10, 1), datetime(2025, 10, 2), compress=compress)
+
+    assert db.queries == [{"updated_at": {"$gte": datetime(2025, 10, 1), "$lt": datetime(2025, 10, 2)}}]
+    assert report["rows"] == 3
+    assert report["file"].endswith(".ndjson.gz" if compress else ".ndjson")
+
+    opener = gzip.open if compress else open
+    with opener(report["file"], "rb") as f:
+        content = f.read()
+    rows = [json.loads(line) for line in content.decode("utf-8").splitlines()]
+    assert [row["book_id"] for row in rows] == ["book-0", "book-1", "book-2"]
+    assert rows[0]["updated_at"] == "2025-10-01T12:00:00"
+    assert report["content_sha256"] == hashlib.sha256(content).hexdigest()
+
+    manifest = json.loads((report_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest[Path(report["file"]).name]["rows"] == 3
+    assert not list(report_dir.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_change_report_rerun_replaces_file(report_dir):
+    start, end = datetime(2025, 10, 1), datetime(2025, 10, 2)
+    await generate_change_report(FakeDB(make_changes(5)), start, end)
+    report = await generate_change_report(FakeDB(make_changes(2)), start, end)
+
+    with open(report["file"], encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+    manifest = json.loads((report_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert list(manifest.values())[0]["rows"] == 2
+
+
+@pytest.mark.asyncio
+async def test_change_report_failure_keeps_previous_file(report_dir):
+    start, end = datetime(2025, 10, 1), datetime(2025, 10, 2)
+    previous = await generate_change_report(FakeDB(make_changes(2)), start, end)
+
+    broken = make_changes(2)
+    broken[1]["updated_at"] = "not a datetime"
+    with pytest.raises(AttributeError):
+        await generate_change_report(FakeDB(broken), start, end)
+
+    with open(previous["file"], encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+    assert not list(report_dir.glob("*.tmp"))
+
+
+def test_manifest_concurrent_updates_keep_all_entries(report_dir):
+    report_dir.mkdir(parents=True)
+
+    def record(i):
+        update_manifest(report_dir / f"Change-Log-{i}.ndjson", {"rows": i})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(record, range(200)))
+
+    manifest = json.loads((report_dir / "manifest.json").read_text(encoding="utf-8"))
+    assert len(manifest) == 200
+    assert manifest["Change-Log-42.ndjson"] == {"rows": 42}
@@ -0,0 +1,120 @@
+import pytest, pytest_asyncio
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from utils.settings import settings
+from utils.change_summary import materialize_change_summary, SUMMARY_COLLECTION, DAILY_SUMMARY_COLLECTION
+
+
+DAY_1 = datetime(2025, 10, 1)
+DAY_2 = datetime(2025, 10, 2)
+DAY_3 = datetime(2025, 10, 3)
+DAY_4 = datetime(2025, 10, 4)
+
+
+@pytest_asyncio.fixture
+async def db():
+    mongo_client = AsyncIOMotorClient(settings.MONGO_URI)
+    db_name = f"{settings.MONGO_DB}_change_summary_test"
+    await mongo_client.drop_database(db_name)
+    db = mongo_client[db_name]
+
+    books = await db.books.insert_many([
+        {"title": "Poems A", "category": "Poetry"},
+        {"title": "Poems B", "category": "Poetry"},
+        {"title": "Trips C", "category": "Travel"},
+    ])
+    db.book_ids = books.inserted_ids
+
+    yield db
+
+    await mongo_client.drop_database(db_name)
+    mongo_client.close()
+
+
+def price_change(book_id, updated_at, previous, current):
+    return {
+        "type": 2, "book_id": book_id, "updated_at": updated_at,
+        "changes": {"previous_price_incl": previous, "current_price_incl": current},
+    }
+
+
+def stock_change(book_id, updated_at, previous, current):
+    return {
+        "type": 2, "book_id": book_id, "updated_at": updated_at,
+        "changes": {"previous_stock": previous, "current_stock": current},
+    }
+
+
+async def get_rows(db, collection):
+    rows = await db[collection].find({}, projection={"_id": 0, "updated_at": 0}).to_list(length=None)
+    return {(row["date"], row.get("category"), row["type"]): row for row in rows}
+
+
+@pytest.mark.asyncio
+async def test_materialize_change_summary(db):
+    a, b, c = db.book_ids
+    await db.changes.insert_many([
+        {"type": 1, "book_id": a, "updated_at": DAY_1.replace(hour=9)},
+        price_change(b, DAY_1.replace(hour=10), 20.0, 15.0),
+        price_change(c, DAY_1.replace(hour=11), 10.0, 12.0),
+        stock_change(c, DAY_1.replace(hour=11), 5, 3),
+        price_change(a, DAY_2.replace(hour=9), 30.0, 25.0),
+    ])
+
+    await materialize_change_summary(db, DAY_2, DAY_3)
+
+    rows = await get_rows(db, SUMMARY_COLLECTION)
+    assert set(rows) == {
+        ("2025-10-01", "Poetry", 1),
+        ("2025-10-01", "Poetry", 2),
+        ("2025-10-01", "Travel", 2),
+        ("2025-10-02", "Poetry", 2),
+    }
+    assert rows[("2025-10-01", "Poetry", 1)]["count"] == 1
+    assert rows[("2025-10-01", "Poetry", 1)]["type_name"] == "New Book Added"
+    assert rows[("2025-10-01", "Poetry", 1)]["price_drops"] == 0
+    poetry = rows[("2025-10-01", "Poetry", 2)]
+    assert (poetry["count"], poetry["price_drops"], poetry["price_increases"], poetry["stock_changes"]) == (1, 1, 0, 0)
+    assert poetry["type_name"] == "Changed"
+    travel = rows[("2025-10-01", "Travel", 2)]
+    assert (travel["count"], travel["price_drops"], travel["price_increases"], travel["stock_changes"]) == (2, 0, 1, 1)
+
+    daily = await get_rows(db, DAILY_SUMMARY_COLLECTION)
+    assert set(daily) == {("2025-10-01", None, 1), ("2025-10-01", None, 2), ("2025-10-02", None, 2)}
+    day_1_changed = daily[("2025-10-01", None, 2)]
+    assert (day_1_changed["count"], day_1_changed["price_drops"], day_1_changed["price_increases"], day_1_changed["stock_changes"]) == (3, 1, 1, 1)
+
+    # A second incremental run merges into the existing rows without duplicating them
+    await db.changes.insert_one(stock_change(b, DAY_2.replace(hour=12), 4, 2))
+    await materialize_change_summary(db, DAY_2, DAY_3)
+
+    assert await db[SUMMARY_COLLECTION].count_documents({}) == 4
+    assert await db[DAILY_SUMMARY_COLLECTION].count_documents({}) == 3
+    rows = await get_rows(db, SUMMARY_COLLECTION)
+    poetry = rows[("2025-10-02", "Poetry", 2)]
+    assert (poetry["count"], poetry["price_drops"], poetry["stock_changes"]) == (2, 1, 1)
+    daily = await get_rows(db, DAILY_SUMMARY_COLLECTION)
+    assert daily[("2025-10-02", None, 2)]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_materialize_change_summary_catches_up_missed_days(db):
+    a, b, c = db.book_ids
+    await db.changes.insert_one(price_change(a, DAY_1.replace(hour=9), 30.0, 25.0))
+    await materialize_change_summary(db, DAY_1, DAY_2)
+
+    # Changes from a day whose run failed are picked up by the next run
+    await db.changes.insert_many([
+        price_change(b, DAY_2.replace(hour=9), 20.0, 15.0),
+        price_change(c, DAY_3.replace(hour=9), 10.0, 12.0),
+    ])
+    await materialize_change_summary(db, DAY_3, DAY_4)
+
+    rows = await get_rows(db, SUMMARY_COLLECTION)
+    assert set(rows) == {
+        ("2025-10-01", "Poetry", 2),
+        ("2025-10-02", "Poetry", 2),
+        ("2025-10-03", "Travel", 2),
+    }
+    daily = await get_rows(db, DAILY_SUMMARY_COLLECTION)
+    assert daily[("2025-10-02", None, 2)]["price_drops"] == 1
@@ -0,0 +1,186 @@
+import asyncio, logging, hashlib, pytest, httpx
+from concurrent.futures import ThreadPoolExecutor
+from bson import ObjectId
+from httpx import AsyncClient, ASGITransport
+from utils.settings import settings
+from utils import cover_images
+from utils.cover_images import store_cover, get_cover_path, fetch_cover, mirror_covers
+import api.main
+
+
+@pytest.fixture
+def cover_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "COVER_DIR", str(tmp_path / "covers"))
+    return tmp_path / "covers"
+
+
+def test_store_cover_concurrent_same_content(cover_dir):
+    content = b"same cover image"
+    for _ in range(50):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            digests = list(pool.map(lambda _: store_cover(content), range(4)))
+        assert set(digests) == {hashlib.sha256(content).hexdigest()}
+        get_cover_path(digests[0]).unlink()
+
+    store_cover(content)
+    assert [p.name for p in cover_dir.rglob("*") if p.is_file()] == [hashlib.sha256(content).hexdigest()]
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield doc
+        return iterate()
+
+
+class FakeBooks:
+    def __init__(self, docs):
+        self.docs = docs
+        self.updated = {}
+
+    def find(self, query, projection=None):
+        return FakeCursor(self.docs)
+
+    async def update_one(self, query, update):
+        self.updated[query["_id"]] = update["$set"]["cover"]
+
+
+class FakeDB:
+    def __init__(self, docs):
+        self.books = FakeBooks(docs)
+
+
+@pytest.mark.asyncio
+async def test_mirror_covers_continues_after_failure(cover_dir, monkeypatch):
+    real_store_cover = cover_images.store_cover
+
+    def store_cover_failing(content):
+        if content == b"broken":
+            raise OSError("disk full")
+        return real_store_cover(content)
+
+    monkeypatch.setattr(cover_images, "store_cover", store_cover_failing)
+
+    def handler(request):
+        name = request.url.path.strip("/")
+        return httpx.Response(200, content=name.encode(), headers={"content-type": "image/jpeg"})
+
+    db = FakeDB([{"_id": i, "image_url": f"http://test/{name}"} for i, name in enumerate(["a", "broken", "a", "b"])])
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        counts = await mirror_covers(db, client, logger=logging.getLogger(__name__))
+
+    assert counts == {"downloaded": 3, "unchanged": 0, "failed": 1}
+    assert sorted(db.books.updated) == [0, 2, 3]
+    assert db.books.updated[0]["sha256"] == db.books.updated[2]["sha256"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_cover_conditional_request_unchanged(cover_dir):
+    digest = store_cover(b"cover")
+    previous = {
+        "sha256": digest,
+        "content_type": "image/jpeg",
+        "size": 5,
+        "etag": '"origin-etag"',
+        "last_modified": "Wed, 01 Oct 2025 00:00:00 GMT",
+        "source_url": "http://test/a.jpg",
+    }
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(304)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        cover = await fetch_cover(client, "http://test/a.jpg", previous, logger=logging.getLogger(__name__))
+
+    assert cover is previous
+    assert requests[0].headers["if-none-match"] == '"origin-etag"'
+    assert requests[0].headers["if-modified-since"] == "Wed, 01 Oct 2025 00:00:00 GMT"
+
+
+@pytest.mark.asyncio
+async def test_fetch_cover_rejects_invalid_responses(cover_dir, monkeypatch):
+    monkeypatch.setattr(settings, "COVER_MAX_BYTES", 100)
+
+    def handler(request):
+        if request.url.path == "/error.jpg":
+            return httpx.Response(200, content=b"<html>Not Found</html>", headers={"content-type": "text/html"})
+        if request.url.path == "/vector.svg":
+            return httpx.Response(200, content=b"<svg></svg>", headers={"content-type": "image/svg+xml"})
+        return httpx.Response(200, content=b"x" * 101, headers={"content-type": "image/jpeg"})
+
+    logger = logging.getLogger(__name__)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        for path in ("/error.jpg", "/vector.svg", "/huge.jpg"):
+            assert await fetch_cover(client, f"http://test{path}", None, logger=logger) is None
+
+        db = FakeDB([{"_id": 0, "image_url": "http://test/error.jpg"}])
+        counts = await mirror_covers(db, client, logger=logger)
+
+    assert counts == {"downloaded": 0, "unchanged": 0, "failed": 1}
+    assert not cover_dir.exists() or not [p for p in cover_dir.rglob("*") if p.is_file()]
+
+
+class FakeApiBooks:
+    def __init__(self, book):
+        self.book = book
+
+    async def find_one(self, query, projection=None):
+        if query["_id"] != self.book["_id"]:
+            return None
+        return dict(self.book)
+
+
+class FakeApiDB:
+    def __init__(self, book):
+        self.books = FakeApiBooks(book)
+
+
+async def allow_all():
+    return True
+
+
+@pytest.mark.asyncio
+async def test_get_book_cover_route(cover_dir, monkeypatch):
+    content = b"\xff\xd8 cover image"
+    digest = store_cover(content)
+    book_id = ObjectId()
+    book = {
+        "_id": book_id,
+        "title": "Cover Test",
+        "image_url": "http://test/a.jpg",
+        "cover": {"sha256": digest, "content_type": "image/jpeg", "size": len(content), "source_url": "http://test/a.jpg"},
+    }
+    monkeypatch.setattr(api.main, "db", FakeApiDB(book))
+    monkeypatch.setitem(api.main.app.dependency_overrides, api.main.limiter, allow_all)
+    headers = {settings.API_KEY_NAME: settings.API_KEY}
+
+    async with AsyncClient(transport=ASGITransport(app=api.main.app), base_url="http://test") as client:
+        resp = await client.get(f"/books/{book_id}/cover", headers=headers)
+        assert resp.status_code == 200
+        assert resp.content == content
+        assert resp.headers["content-type"] == "image/jpeg"
+        assert resp.headers["etag"] == f'"{digest}"'
+        assert resp.headers["cache-control"] == f"private, max-age={settings.COVER_CACHE_MAX_AGE}"
+        assert resp.headers["x-content-type-options"] == "nosniff"
+
+        cached_resp = await client.get(f"/books/{book_id}/cover", headers={**headers, "If-None-Match": f'"{digest}"'})
+        assert cached_resp.status_code == 304
+        assert cached_resp.headers["etag"] == f'"{digest}"'
+        assert cached_resp.content == b""
+
+        book_resp = await client.get(f"/books/{book_id}", headers=headers)
+        assert book_resp.status_code == 200
+        assert book_resp.json()["cover_url"] == f"/books/{book_id}/cover"
+        assert "cover" not in book_resp.json()
+
+        missing_resp = await client.get(f"/books/{ObjectId()}/cover", headers=headers)
+        assert missing_resp.status_code == 404
+
+        unauthorized_resp = await client.get(f"/books/{book_id}/cover")
+        assert unauthorized_resp.status_code == 401
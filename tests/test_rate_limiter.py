@@ -0,0 +1,37 @@
+import uuid, pytest
+from redis.asyncio import Redis
+from utils.settings import settings
+from utils.rate_limiter import LocalRateLimiter, MAX_BUCKETS
+
+
+@pytest.mark.asyncio
+async def test_local_limiter_enforces_limit():
+    limiter = LocalRateLimiter(Redis.from_url(settings.REDIS_URI), "5/minute", lease_size=2, prefix=f"test_limiter_{uuid.uuid4().hex}")
+    results = [await limiter.hit("client") for _ in range(8)]
+    assert results == [True] * 5 + [False] * 3
+
+
+@pytest.mark.asyncio
+async def test_local_limiter_shares_limit_across_workers():
+    redis = Redis.from_url(settings.REDIS_URI)
+    prefix = f"test_limiter_{uuid.uuid4().hex}"
+    workers = [LocalRateLimiter(redis, "10/minute", lease_size=3, prefix=prefix) for _ in range(3)]
+    allowed = 0
+    for _ in range(10):
+        for worker in workers:
+            allowed += await worker.hit("client")
+    assert allowed == 10
+
+
+def test_local_limiter_prunes_buckets():
+    limiter = LocalRateLimiter(Redis.from_url(settings.REDIS_URI), "5/minute")
+    for i in range(100):
+        limiter.get_bucket(f"client-{i}", 1)
+    assert len(limiter.buckets) == 100
+
+    limiter.get_bucket("client-0", 2)
+    assert list(limiter.buckets) == ["client-0"]
+
+    for i in range(MAX_BUCKETS + 1):
+        limiter.get_bucket(f"client-{i}", 2)
+    assert len(limiter.buckets) <= MAX_BUCKETS
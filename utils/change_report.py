@@ -0,0 +1,121 @@
+import os, json, gzip, asyncio, hashlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+REPORT_DIR = "change_reports"
+MANIFEST_FILE = "manifest.json"
+BATCH_SIZE = 500
+
+
+def get_report_path(start: datetime, end: datetime, compress: bool = False) -> Path:
+    name = f"Change-Log-{start.strftime('%Y.%m.%d')}"
+    if end - start > timedelta(days=1):
+        name += f"-{(end - timedelta(days=1)).strftime('%Y.%m.%d')}"
+    name += ".ndjson.gz" if compress else ".ndjson"
+    report_file = Path(f"{REPORT_DIR}/{name}").resolve()
+    report_file.parent.mkdir(parents=True, exist_ok=True)
+    return report_file
+
+
+def serialize_change(doc: dict) -> str:
+    doc["_id"] = str(doc["_id"])
+    doc["book_id"] = str(doc["book_id"])
+    if "updated_at" in doc:
+        doc["updated_at"] = doc["updated_at"].isoformat()
+    return json.dumps(doc, ensure_ascii=False)
+
+
+@contextmanager
+def manifest_lock(manifest_file: Path):
+    """Hold an exclusive lock on the manifest's lock file, so concurrent report runs don't drop each other's entries."""
+    lock_file = manifest_file.with_name(manifest_file.name + ".lock")
+    with open(lock_file, "a+b") as f:
+        if os.name == "nt":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def update_manifest(report_file: Path, entry: dict):
+    manifest_file = report_file.parent / MANIFEST_FILE
+    with manifest_lock(manifest_file):
+        manifest = {}
+        if manifest_file.exists():
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        manifest[report_file.name] = entry
+
+        tmp_file = manifest_file.with_name(manifest_file.name + ".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_file, manifest_file)
+
+
+async def generate_change_report(db, start: datetime, end: datetime, compress: bool = False) -> dict:
+    """Stream changes in [start, end) to an NDJSON report and record it in the manifest.
+
+    Documents are written one line at a time straight from the cursor, so memory
+    stays flat regardless of the number of changes. The report is written to a
+    temporary file first and renamed into place, so re-runs replace the previous
+    report instead of appending to it.
+    """
+    report_file = get_report_path(start, end, compress)
+    tmp_file = report_file.with_name(report_file.name + ".tmp")
+
+    query = {"updated_at": {"$gte": start, "$lt": end}}
+    cursor = db.changes.find(query, batch_size=BATCH_SIZE).sort("_id", 1)
+
+    row_count = 0
+    content_hash = hashlib.sha256()
+    try:
+        with open(tmp_file, "wb") as raw:
+            f = gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) if compress else raw
+            try:
+                async for doc in cursor:
+                    line = (serialize_change(doc) + "\n").encode("utf-8")
+                    content_hash.update(line)
+                    f.write(line)
+                    row_count += 1
+            finally:
+                if compress:
+                    f.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_file, report_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+    file_hash = hashlib.sha256()
+    with open(report_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            file_hash.update(chunk)
+
+    entry = {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "rows": row_count,
+        "compressed": compress,
+        "bytes": report_file.stat().st_size,
+        "content_sha256": content_hash.hexdigest(),
+        "file_sha256": file_hash.hexdigest(),
+        "generated_at": datetime.now().isoformat(),
+    }
+    await asyncio.to_thread(update_manifest, report_file, entry)
+    return {"file": str(report_file), **entry}
@@ -0,0 +1,136 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from models.constants import Switch_Map
+
+
+SUMMARY_COLLECTION = "change_summary"
+DAILY_SUMMARY_COLLECTION = "change_summary_daily"
+SUMMARY_STATE_COLLECTION = "change_summary_state"
+
+
+def build_summary_pipeline(start: Optional[datetime] = None, end: Optional[datetime] = None) -> list:
+    """Aggregation pipeline grouping changes by date, category and change type."""
+    pipeline = []
+
+    updated_at = {}
+    if start is not None:
+        updated_at["$gte"] = start
+    if end is not None:
+        updated_at["$lt"] = end
+    if updated_at:
+        pipeline.append({"$match": {"updated_at": updated_at}})
+
+    pipeline += [
+        {"$lookup": {
+            "from": "books",
+            "localField": "book_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"_id": 0, "category": 1}}],
+            "as": "book",
+        }},
+        {"$group": {
+            "_id": {
+                "date": {"$dateToString": {"format": "%Y-%m-%d", "date": "$updated_at"}},
+                "category": {"$ifNull": [{"$first": "$book.category"}, "Unknown"]},
+                "type": "$type",
+            },
+            "count": {"$sum": 1},
+            "price_drops": {"$sum": {"$cond": [
+                {"$lt": ["$changes.current_price_incl", "$changes.previous_price_incl"]}, 1, 0
+            ]}},
+            "price_increases": {"$sum": {"$cond": [
+                {"$gt": ["$changes.current_price_incl", "$changes.previous_price_incl"]}, 1, 0
+            ]}},
+            "stock_changes": {"$sum": {"$cond": [
+                {"$ne": ["$changes.current_stock", "$changes.previous_stock"]}, 1, 0
+            ]}},
+        }},
+        {"$set": {
+            "date": "$_id.date",
+            "category": "$_id.category",
+            "type": "$_id.type",
+        }},
+        {"$set": {
+            "type_name": Switch_Map,
+            "updated_at": "$$NOW",
+        }},
+    ]
+    return pipeline
+
+
+def build_daily_summary_pipeline(start: Optional[datetime] = None, end: Optional[datetime] = None) -> list:
+    """Aggregation pipeline totalling the summary rollup per date and change type across categories."""
+    pipeline = []
+
+    date = {}
+    if start is not None:
+        date["$gte"] = start.strftime("%Y-%m-%d")
+    if end is not None:
+        date["$lt"] = end.strftime("%Y-%m-%d")
+    if date:
+        pipeline.append({"$match": {"date": date}})
+
+    pipeline += [
+        {"$group": {
+            "_id": {"date": "$date", "type": "$type"},
+            "count": {"$sum": "$count"},
+            "price_drops": {"$sum": "$price_drops"},
+            "price_increases": {"$sum": "$price_increases"},
+            "stock_changes": {"$sum": "$stock_changes"},
+        }},
+        {"$set": {
+            "date": "$_id.date",
+            "type": "$_id.type",
+        }},
+        {"$set": {
+            "type_name": Switch_Map,
+            "updated_at": "$$NOW",
+        }},
+    ]
+    return pipeline
+
+
+async def materialize_change_summary(db, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Recompute the rollup rows for changes in [start, end) and merge them into the summary collections.
+
+    Rows grouped by date, category and type go to the summary collection, and their
+    per date and type totals go to the daily summary collection. The first day of the
+    last successful run is kept as a watermark and every run recomputes from it, so a
+    failed or missed run is caught up by the next one. Without a watermark the whole
+    history is rolled up, which backfills older days after deployment.
+    """
+    summary = db[SUMMARY_COLLECTION]
+    await summary.create_index([("date", -1), ("category", 1), ("type", 1)])
+    await db[DAILY_SUMMARY_COLLECTION].create_index([("date", -1), ("type", 1)])
+
+    state = await db[SUMMARY_STATE_COLLECTION].find_one({"_id": SUMMARY_COLLECTION})
+    if state is None:
+        start = None
+    elif start is None or state["watermark"] < start:
+        start = state["watermark"]
+
+    pipeline = build_summary_pipeline(start, end)
+    pipeline.append({"$merge": {
+        "into": SUMMARY_COLLECTION,
+        "on": "_id",
+        "whenMatched": "replace",
+        "whenNotMatched": "insert",
+    }})
+    await db.changes.aggregate(pipeline).to_list(length=None)
+
+    pipeline = build_daily_summary_pipeline(start, end)
+    pipeline.append({"$merge": {
+        "into": DAILY_SUMMARY_COLLECTION,
+        "on": "_id",
+        "whenMatched": "replace",
+        "whenNotMatched": "insert",
+    }})
+    await summary.aggregate(pipeline).to_list(length=None)
+
+    last_day = (end - timedelta(days=1)) if end is not None else datetime.today()
+    watermark = last_day.replace(hour=0, minute=0, second=0, microsecond=0)
+    await db[SUMMARY_STATE_COLLECTION].update_one(
+        {"_id": SUMMARY_COLLECTION},
+        {"$set": {"watermark": watermark, "updated_at": datetime.now()}},
+        upsert=True
+    )
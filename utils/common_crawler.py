@@ -1,6 +1,5 @@
 import re, json, hashlib, httpx
 from datetime import datetime, timedelta
-from pathlib import Path
 from bs4 import BeautifulSoup
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -8,6 +7,9 @@ from .settings import settings
 from models.constants import CrawlerType, Words
 from models.book import Book
 from utils.logger import get_logger
+from utils.change_report import generate_change_report
+from utils.change_summary import materialize_change_summary
+from utils.cover_images import mirror_covers
 
 
 BASE = settings.CRAWL_URL
@@ -108,13 +110,6 @@ def parse_book_page(html: str, source_url: str) -> dict:
     }
     return data
 
-def get_file_name(today, page_no):
-    report_file = f"Change-Log-{today.strftime("%Y.%m.%d")}-{page_no}.json"
-    report_file = Path(f"change_reports/{report_file}").resolve()    
-    report_file.parent.mkdir(parents=True, exist_ok=True)
-    return report_file
-    
-
 async def crawl_books(crawler_type:CrawlerType):
     
     log_name = "crawler"
@@ -262,49 +257,42 @@ async def crawl_books(crawler_type:CrawlerType):
                 print(log_message)
                 logger.error(log_message)
         
+        if settings.MIRROR_COVER_IMAGES:
+            log_message = f"Mirroring Cover Images from {crawler_type.value}"
+            print(log_message)
+            logger.info(log_message)
+            try:
+                counts = await mirror_covers(db, client, logger=logger)
+                log_message = f"Cover Images Mirrored: {counts['downloaded']} downloaded, {counts['unchanged']} unchanged, {counts['failed']} failed"
+                print(log_message)
+                logger.info(log_message)
+            except Exception as e:
+                log_message = f"Error on mirroring cover images: {e}"
+                print(log_message)
+                logger.error(log_message)
+        
     log_message = f"Completed Crawling from {crawler_type.value} at {datetime.now()}"
     print(log_message)
     logger.info(log_message)
     
+    if crawler_type==CrawlerType.Scheduler:
+        try:
+            await materialize_change_summary(db, today, tomorrow)
+            log_message = f"Change Summary Updated for {today.strftime('%d-%m-%Y')}"
+            print(log_message)
+            logger.info(log_message)
+        except Exception as e:
+            log_message = f"Error on updating change summary, it will be caught up on the next run: {e}"
+            print(log_message)
+            logger.error(log_message)
+    
     if crawler_type==CrawlerType.Scheduler and settings.GENERATE_CHANGE_REPORT:
-        log_message = f"Generating Daily Change Report for {today.strftime("%d-%m-%Y")}"
+        log_message = f"Generating Daily Change Report for {today.strftime('%d-%m-%Y')}"
         print(log_message)
         logger.info(log_message)
         
-        batch_size = 500
-        page_count = 1
-        last_id = None
+        report = await generate_change_report(db, today, tomorrow, compress=settings.COMPRESS_CHANGE_REPORT)
         
-        while True:
-            query = {
-                "updated_at": {"$gte": today, "$lt": tomorrow}
-            }
-            
-            if last_id:
-                query["_id"] = {"$gt": ObjectId(last_id)}
-            
-            cursor = db.changes.find(query).sort("_id", 1).limit(batch_size)
-            docs = await cursor.to_list(length=batch_size)
-                        
-            if not docs:
-                break
-            
-            report_file = get_file_name(today, page_count)
-                        
-            with open(report_file, "a", encoding="utf-8") as f:
-                for doc in docs:
-                    doc["_id"] = str(doc["_id"])
-                    doc["book_id"] = str(doc["book_id"])
-                    if "updated_at" in doc:
-                        doc["updated_at"] = doc["updated_at"].isoformat()
-                f.write(json.dumps(docs))
-            
-            last_id = str(docs[-1]["_id"])
-            page_count += 1
-        
-        
-        log_message = f"Daily Change Report Generation for {today.strftime("%d-%m-%Y")} Complete"
+        log_message = f"Daily Change Report Generation for {today.strftime('%d-%m-%Y')} Complete: {report['rows']} changes written to {report['file']}"
         print(log_message)
         logger.info(log_message)
-        
-        
\ No newline at end of file
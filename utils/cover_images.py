@@ -0,0 +1,115 @@
+import os, asyncio, hashlib, tempfile, httpx
+from pathlib import Path
+from typing import Optional
+from .settings import settings
+
+
+# Raster formats only, since covers are served from the API's own origin
+# and SVG or HTML bodies could carry scripts.
+COVER_CONTENT_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+
+def get_cover_path(digest: str) -> Path:
+    return Path(f"{settings.COVER_DIR}/{digest[:2]}/{digest}").resolve()
+
+
+def store_cover(content: bytes) -> str:
+    """Write the image under its SHA-256 digest, skipping the write if the same image is already stored."""
+    digest = hashlib.sha256(content).hexdigest()
+    cover_file = get_cover_path(digest)
+    if cover_file.exists():
+        return digest
+
+    cover_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = None
+    try:
+        with tempfile.NamedTemporaryFile(dir=cover_file.parent, prefix=f"{digest}.", suffix=".tmp", delete=False) as f:
+            tmp_file = Path(f.name)
+            f.write(content)
+        os.replace(tmp_file, cover_file)
+    except OSError:
+        if tmp_file:
+            tmp_file.unlink(missing_ok=True)
+        # Another writer may have stored the same image first
+        if not cover_file.exists():
+            raise
+    return digest
+
+
+async def fetch_cover(client: httpx.AsyncClient, image_url: str, previous: Optional[dict], timeout=20, logger=None) -> Optional[dict]:
+    headers = {}
+    if previous and previous.get("source_url") == image_url and get_cover_path(previous["sha256"]).exists():
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+
+    try:
+        async with client.stream("GET", image_url, headers=headers, timeout=timeout) as resp:
+            if resp.status_code == 304:
+                return previous
+            resp.raise_for_status()
+
+            content_type = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type not in COVER_CONTENT_TYPES:
+                raise ValueError(f"unexpected content type '{content_type}'")
+            if int(resp.headers.get("content-length", 0)) > settings.COVER_MAX_BYTES:
+                raise ValueError(f"cover larger than {settings.COVER_MAX_BYTES} bytes")
+
+            content = bytearray()
+            async for chunk in resp.aiter_bytes():
+                content.extend(chunk)
+                if len(content) > settings.COVER_MAX_BYTES:
+                    raise ValueError(f"cover larger than {settings.COVER_MAX_BYTES} bytes")
+
+        digest = await asyncio.to_thread(store_cover, bytes(content))
+    except Exception as e:
+        log_message = f"Cover download failed for {image_url}: {e}"
+        print(log_message)
+        logger.error(log_message)
+        return None
+
+    return {
+        "sha256": digest,
+        "content_type": content_type,
+        "size": len(content),
+        "etag": resp.headers.get("etag"),
+        "last_modified": resp.headers.get("last-modified"),
+        "source_url": image_url,
+    }
+
+
+async def mirror_covers(db, client: httpx.AsyncClient, logger=None):
+    """Download every book's cover image, using conditional requests for covers already mirrored."""
+    semaphore = asyncio.Semaphore(settings.COVER_CONCURRENCY)
+    counts = {"downloaded": 0, "unchanged": 0, "failed": 0}
+
+    async def mirror_one(book):
+        previous = book.get("cover")
+        try:
+            async with semaphore:
+                cover = await fetch_cover(client, book["image_url"], previous, logger=logger)
+            if cover is None:
+                counts["failed"] += 1
+            elif cover is previous:
+                counts["unchanged"] += 1
+            else:
+                await db.books.update_one({"_id": book["_id"]}, {"$set": {"cover": cover}})
+                counts["downloaded"] += 1
+        except Exception as e:
+            counts["failed"] += 1
+            log_message = f"Cover mirroring failed for {book['image_url']}: {e}"
+            print(log_message)
+            logger.error(log_message)
+
+    batch = []
+    cursor = db.books.find({"image_url": {"$ne": None}}, projection={"image_url": 1, "cover": 1})
+    async for book in cursor:
+        batch.append(mirror_one(book))
+        if len(batch) >= settings.COVER_CONCURRENCY * 10:
+            await asyncio.gather(*batch)
+            batch = []
+    if batch:
+        await asyncio.gather(*batch)
+
+    return counts
@@ -0,0 +1,94 @@
+import time, asyncio
+from fastapi import HTTPException, Request
+from limits import parse
+from redis.asyncio import Redis
+from slowapi.util import get_remote_address
+
+
+# Atomically takes up to ARGV[1] tokens from the shared fixed window counter
+# and returns how many were actually granted before the limit was reached.
+LEASE_SCRIPT = """
+local requested = tonumber(ARGV[1])
+local used = redis.call('INCRBY', KEYS[1], requested)
+if used == requested then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+local granted = requested - math.max(used - tonumber(ARGV[3]), 0)
+return math.max(granted, 0)
+"""
+
+# Buckets kept per worker before they are all dropped. Dropping a bucket only
+# strands its unspent leased tokens, so the shared limit is never exceeded.
+MAX_BUCKETS = 10000
+
+
+class TokenBucket:
+    def __init__(self, window: int):
+        self.window = window
+        self.tokens = 0
+        self.exhausted = False
+        self.lock = asyncio.Lock()
+
+
+class LocalRateLimiter:
+    """Two-tier rate limiter: an in-process token bucket per client backed by a shared Redis counter.
+
+    Each worker leases tokens from Redis in batches of ``lease_size`` and spends them
+    locally, so only one request per batch pays a Redis round-trip. Redis still holds
+    the fixed window total across all workers and never grants more than the limit;
+    the only error is tokens a worker leased but did not spend before the window
+    ended or its bucket was dropped, at most ``lease_size`` per worker per client.
+    """
+
+    def __init__(self, redis: Redis, limit: str, lease_size: int = 10, key_func=get_remote_address, prefix: str = "local_limiter"):
+        item = parse(limit)
+        self.redis = redis
+        self.amount = item.amount
+        self.period = item.get_expiry()
+        self.lease_size = max(1, min(lease_size, self.amount))
+        self.key_func = key_func
+        self.prefix = prefix
+        self.buckets: dict[str, TokenBucket] = {}
+        self.pruned_window = None
+        self.lease = redis.register_script(LEASE_SCRIPT)
+
+    def current_window(self) -> int:
+        return int(time.time() // self.period)
+
+    def get_bucket(self, key: str, window: int) -> TokenBucket:
+        if window != self.pruned_window:
+            self.buckets = {k: b for k, b in self.buckets.items() if b.window == window}
+            self.pruned_window = window
+        bucket = self.buckets.get(key)
+        if bucket is None or bucket.window != window:
+            if len(self.buckets) >= MAX_BUCKETS:
+                self.buckets = {}
+            bucket = TokenBucket(window)
+            self.buckets[key] = bucket
+        return bucket
+
+    async def hit(self, key: str) -> bool:
+        window = self.current_window()
+        bucket = self.get_bucket(key, window)
+
+        if bucket.tokens > 0:
+            bucket.tokens -= 1
+            return True
+        if bucket.exhausted:
+            return False
+
+        async with bucket.lock:
+            if bucket.tokens == 0 and not bucket.exhausted:
+                redis_key = f"{self.prefix}/{key}/{window}"
+                granted = int(await self.lease(keys=[redis_key], args=[self.lease_size, self.period, self.amount]))
+                bucket.tokens += granted
+                bucket.exhausted = granted < self.lease_size
+            if bucket.tokens > 0:
+                bucket.tokens -= 1
+                return True
+        return False
+
+    async def __call__(self, request: Request):
+        if not await self.hit(self.key_func(request)):
+            raise HTTPException(status_code=429, detail=f"Rate limit exceeded: {self.amount} per {self.period} seconds")
+        return True
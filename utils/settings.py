@@ -10,11 +10,18 @@ class Settings(BaseSettings):
     SCHEDULER_HOUR:int
     SCHEDULER_MINUTE:int
     GENERATE_CHANGE_REPORT:bool
+    COMPRESS_CHANGE_REPORT:bool = False
     REDIS_URI:str
     API_KEY:str
     API_KEY_NAME:str
     LIMITER_FREQUENCY:str
     LIMITER_TIMING:str
+    LIMITER_LEASE_SIZE:int = 10
+    MIRROR_COVER_IMAGES:bool = True
+    COVER_DIR:str = "covers"
+    COVER_CONCURRENCY:int = 10
+    COVER_MAX_BYTES:int = 5242880
+    COVER_CACHE_MAX_AGE:int = 604800
         
     class Config:
         env_file = str(Path(__file__).resolve().parent.parent / ".env")